@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+
+INCREASE = "increase"
+DECREASE = "decrease"
+HOLD = "hold"
+
+_DECISION_HISTORY = 32
+
+
+def _read_cgroup_quota(cgroup_root: str) -> Optional[float]:
+    # cgroup v2: "<quota> <period>" or "max <period>".
+    try:
+        with open(os.path.join(cgroup_root, "cpu.max")) as fh:
+            quota, period = fh.read().split()[:2]
+        if quota == "max":
+            return None
+        return float(quota) / float(period)
+    except (OSError, ValueError):
+        pass
+    # cgroup v1: quota of -1 means unlimited.
+    try:
+        with open(os.path.join(cgroup_root, "cpu", "cpu.cfs_quota_us")) as fh:
+            quota_us = float(fh.read().strip())
+        with open(os.path.join(cgroup_root, "cpu", "cpu.cfs_period_us")) as fh:
+            period_us = float(fh.read().strip())
+        if quota_us <= 0 or period_us <= 0:
+            return None
+        return quota_us / period_us
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus(cgroup_root: str = "/sys/fs/cgroup") -> int:
+    """CPUs this process may use, honouring the container CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    quota = _read_cgroup_quota(cgroup_root)
+    if quota is not None:
+        cpus = min(cpus, int(math.ceil(quota)))
+    return max(1, cpus)
+
+
+def _median(samples: List[float]) -> float:
+    ordered = sorted(samples)
+    mid = len(ordered) // 2
+    if len(ordered) % 2:
+        return float(ordered[mid])
+    return float((ordered[mid - 1] + ordered[mid]) / 2.0)
+
+
+class AIMDConcurrencyController:
+    """
+    Additive-increase / multiplicative-decrease limit for in-flight inferences.
+
+    Latency samples are grouped into windows. A window whose median exceeds
+    `tolerance` times the baseline (lowest recent window median) backs the
+    limit off; otherwise the limit grows by one, but only if the window
+    actually used the current limit.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        tolerance: float = 2.0,
+        backoff: float = 0.75,
+        window_size: int = 20,
+        baseline_windows: int = 30,
+        on_change: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.tolerance = max(1.0, float(tolerance))
+        self.backoff = min(max(float(backoff), 0.1), 0.95)
+        self.window_size = max(1, int(window_size))
+        self._on_change = on_change
+        self._lock = threading.Lock()
+        self._limit = min(self.max_limit, max(self.min_limit, int(initial_limit)))
+        self._window: List[float] = []
+        self._window_peak_in_flight = 0
+        self._window_medians: Deque[float] = deque(maxlen=max(1, int(baseline_windows)))
+        self._counts: Dict[str, int] = {INCREASE: 0, DECREASE: 0, HOLD: 0}
+        self._decisions: Deque[Dict[str, object]] = deque(maxlen=_DECISION_HISTORY)
+        self._last_window_ms = 0.0
+
+    @property
+    def limit(self) -> int:
+        with self._lock:
+            return self._limit
+
+    def observe(self, latency_ms: float, in_flight: int) -> None:
+        changed: Optional[int] = None
+        with self._lock:
+            self._window.append(float(latency_ms))
+            self._window_peak_in_flight = max(self._window_peak_in_flight, int(in_flight))
+            if len(self._window) < self.window_size:
+                return
+            previous = self._limit
+            self._evaluate_window()
+            if self._limit != previous:
+                changed = self._limit
+        if changed is not None and self._on_change is not None:
+            self._on_change(changed)
+
+    def _evaluate_window(self) -> None:
+        window_ms = _median(self._window)
+        peak = self._window_peak_in_flight
+        self._window = []
+        self._window_peak_in_flight = 0
+
+        baseline_ms = min(self._window_medians) if self._window_medians else window_ms
+        self._window_medians.append(window_ms)
+        self._last_window_ms = window_ms
+
+        if window_ms > baseline_ms * self.tolerance:
+            backed_off = max(self.min_limit, int(math.floor(self._limit * self.backoff)))
+            # Already at the floor: nothing changes, so do not report a decrease.
+            decision = DECREASE if backed_off < self._limit else HOLD
+            self._limit = backed_off
+        elif peak >= self._limit and self._limit < self.max_limit:
+            decision = INCREASE
+            self._limit += 1
+        else:
+            decision = HOLD
+
+        self._counts[decision] += 1
+        self._decisions.append(
+            {
+                "at": time.time(),
+                "decision": decision,
+                "limit": self._limit,
+                "windowMs": window_ms,
+                "baselineMs": baseline_ms,
+                "peakInFlight": peak,
+            }
+        )
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "limit": self._limit,
+                "minLimit": self.min_limit,
+                "maxLimit": self.max_limit,
+                "baselineMs": min(self._window_medians) if self._window_medians else 0.0,
+                "lastWindowMs": self._last_window_ms,
+                "decisions": dict(self._counts),
+                "recentDecisions": list(self._decisions),
+            }
@@ -0,0 +1,422 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.error import URLError
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
+
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+_FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+@dataclass
+class JobRecord:
+    job_id: str
+    status: str
+    priority: int
+    created_at: float
+    updated_at: float
+    callback_url: Optional[str] = None
+    payload: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    callback_attempts: int = 0
+    callback_delivered_at: Optional[float] = None
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS validation_jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    callback_url TEXT,
+    payload TEXT,
+    result TEXT,
+    error TEXT,
+    callback_attempts INTEGER NOT NULL DEFAULT 0,
+    callback_delivered_at REAL
+);
+CREATE INDEX IF NOT EXISTS validation_jobs_status_idx ON validation_jobs (status, updated_at);
+"""
+
+# Columns added after the first release; older job files get them on open.
+_ADDED_COLUMNS = {
+    "callback_attempts": "INTEGER NOT NULL DEFAULT 0",
+    "callback_delivered_at": "REAL",
+}
+
+
+class JobStore:
+    """
+    SQLite-backed persistence for validation jobs.
+
+    Payloads are kept only while a job is outstanding so a restart can re-queue
+    it; finished rows keep the result until they age past the TTL. Callback
+    delivery state is stored alongside so undelivered webhooks survive a restart.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(validation_jobs)")}
+        for column, ddl in _ADDED_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE validation_jobs ADD COLUMN {column} {ddl}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def create(
+        self,
+        payload: Dict[str, Any],
+        priority: int,
+        callback_url: Optional[str] = None,
+    ) -> JobRecord:
+        now = time.time()
+        record = JobRecord(
+            job_id=uuid.uuid4().hex,
+            status=JOB_QUEUED,
+            priority=priority,
+            created_at=now,
+            updated_at=now,
+            callback_url=callback_url,
+            payload=payload,
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO validation_jobs"
+                " (job_id, status, priority, created_at, updated_at, callback_url, payload)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.job_id,
+                    record.status,
+                    record.priority,
+                    record.created_at,
+                    record.updated_at,
+                    record.callback_url,
+                    json.dumps(payload),
+                ),
+            )
+        return record
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM validation_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return _row_to_record(row) if row is not None else None
+
+    def mark_running(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE validation_jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                (JOB_RUNNING, time.time(), job_id),
+            )
+
+    def mark_finished(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE validation_jobs"
+                " SET status = ?, updated_at = ?, result = ?, error = ?, payload = NULL"
+                " WHERE job_id = ?",
+                (
+                    status,
+                    time.time(),
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    job_id,
+                ),
+            )
+
+    def outstanding(self) -> List[JobRecord]:
+        """Jobs that were queued or mid-run, e.g. when the process last stopped."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM validation_jobs WHERE status IN (?, ?)"
+                " ORDER BY priority ASC, created_at ASC",
+                (JOB_QUEUED, JOB_RUNNING),
+            ).fetchall()
+        return [_row_to_record(row) for row in rows]
+
+    def record_callback_attempt(self, job_id: str, delivered: bool) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE validation_jobs"
+                " SET callback_attempts = callback_attempts + 1, callback_delivered_at = ?"
+                " WHERE job_id = ?",
+                (time.time() if delivered else None, job_id),
+            )
+
+    def pending_callbacks(self, max_attempts: int) -> List[JobRecord]:
+        """Finished jobs whose webhook has not been delivered and still has attempts left."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM validation_jobs"
+                " WHERE status IN (?, ?) AND callback_url IS NOT NULL"
+                " AND callback_delivered_at IS NULL AND callback_attempts < ?"
+                " ORDER BY updated_at ASC",
+                (*_FINISHED_STATUSES, max_attempts),
+            ).fetchall()
+        return [_row_to_record(row) for row in rows]
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        cutoff = (now if now is not None else time.time()) - self.ttl_seconds
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM validation_jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (*_FINISHED_STATUSES, cutoff),
+            )
+        return int(cursor.rowcount or 0)
+
+
+def _row_to_record(row: sqlite3.Row) -> JobRecord:
+    return JobRecord(
+        job_id=row["job_id"],
+        status=row["status"],
+        priority=int(row["priority"]),
+        created_at=float(row["created_at"]),
+        updated_at=float(row["updated_at"]),
+        callback_url=row["callback_url"],
+        payload=json.loads(row["payload"]) if row["payload"] else None,
+        result=json.loads(row["result"]) if row["result"] else None,
+        error=row["error"],
+        callback_attempts=int(row["callback_attempts"] or 0),
+        callback_delivered_at=(
+            float(row["callback_delivered_at"]) if row["callback_delivered_at"] is not None else None
+        ),
+    )
+
+
+def post_callback(url: str, body: Dict[str, Any], timeout: float = 10.0) -> bool:
+    if urlparse(url).scheme not in ("http", "https"):
+        return False
+    data = json.dumps(body).encode("utf-8")
+    req = Request(
+        url,
+        data=data,
+        method="POST",
+        headers={
+            "Content-Type": "application/json",
+            "User-Agent": "fashion-fullbody-validator/1.0",
+        },
+    )
+    try:
+        with urlopen(req, timeout=timeout) as response:
+            status = getattr(response, "status", None)
+            return status is not None and 200 <= int(status) < 300
+    except (URLError, OSError, ValueError):
+        return False
+
+
+JobHandler = Callable[[Dict[str, Any]], Dict[str, Any]]
+CallbackSender = Callable[[str, Dict[str, Any]], bool]
+
+
+class JobRunner:
+    """
+    Drains persisted jobs through the validation handler in priority order.
+
+    Lower `priority` values run first; ties run in submission order. Webhook
+    callbacks are delivered on a separate pool so a slow or dead callback URL
+    never holds up the drain loop; attempts are recorded in the store and
+    undelivered callbacks are resumed by `start()`.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handler: JobHandler,
+        workers: int = 1,
+        callback_sender: CallbackSender = post_callback,
+        callback_attempts: int = 3,
+        callback_backoff_seconds: float = 0.5,
+        callback_workers: int = 2,
+        purge_interval_seconds: float = 60.0,
+    ) -> None:
+        self.store = store
+        self._handler = handler
+        self._workers = max(1, workers)
+        self._callback_sender = callback_sender
+        self._callback_attempts = max(1, callback_attempts)
+        self._callback_backoff = max(0.0, callback_backoff_seconds)
+        self._callback_workers = max(1, callback_workers)
+        self._callback_pool: Optional[ThreadPoolExecutor] = None
+        self._purge_interval = purge_interval_seconds
+        self._heap: List[Tuple[int, float, int, str]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+        self._stop_event = threading.Event()
+        self._last_purge = 0.0
+
+    def start(self) -> None:
+        with self._cond:
+            if self._threads:
+                return
+            self._stopping = False
+            self._stop_event.clear()
+            for record in self.store.outstanding():
+                self._push(record)
+            pending_callbacks = self.store.pending_callbacks(self._callback_attempts)
+            for idx in range(self._workers):
+                thread = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"validation-job-worker-{idx}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+        for record in pending_callbacks:
+            self._get_callback_pool().submit(self._deliver_callback_safely, record)
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        with self._cond:
+            self._stopping = True
+            self._stop_event.set()
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+            pool, self._callback_pool = self._callback_pool, None
+        for thread in threads:
+            thread.join(timeout)
+        if pool is not None:
+            # Undelivered callbacks stay recorded in the store and resume on start().
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(
+        self,
+        payload: Dict[str, Any],
+        priority: int,
+        callback_url: Optional[str] = None,
+    ) -> JobRecord:
+        record = self.store.create(payload, priority=priority, callback_url=callback_url)
+        with self._cond:
+            self._push(record)
+            self._cond.notify()
+        return record
+
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def _push(self, record: JobRecord) -> None:
+        heapq.heappush(
+            self._heap,
+            (record.priority, record.created_at, next(self._seq), record.job_id),
+        )
+
+    def _next_job_id(self) -> Optional[str]:
+        with self._cond:
+            self._maybe_purge()
+            while not self._heap and not self._stopping:
+                self._cond.wait(timeout=self._purge_interval)
+                self._maybe_purge()
+            if self._stopping:
+                return None
+            return heapq.heappop(self._heap)[3]
+
+    def _maybe_purge(self) -> None:
+        now = time.time()
+        if now - self._last_purge >= self._purge_interval:
+            self._last_purge = now
+            self.store.purge_expired(now)
+
+    def _worker_loop(self) -> None:
+        while True:
+            job_id = self._next_job_id()
+            if job_id is None:
+                return
+            try:
+                self.run_job(job_id)
+            except Exception:
+                # A store error must not take the worker down with it; the job
+                # stays outstanding in the store and is retried on next start().
+                logger.exception("validation job %s failed outside the handler", job_id)
+
+    def run_job(self, job_id: str) -> Optional[JobRecord]:
+        record = self.store.get(job_id)
+        if record is None or record.status in _FINISHED_STATUSES or record.payload is None:
+            return record
+
+        self.store.mark_running(job_id)
+        try:
+            result = self._handler(record.payload)
+        except Exception as exc:
+            self.store.mark_finished(job_id, JOB_FAILED, error=str(exc) or type(exc).__name__)
+        else:
+            self.store.mark_finished(job_id, JOB_SUCCEEDED, result=result)
+
+        finished = self.store.get(job_id)
+        if finished is not None and finished.callback_url:
+            self._get_callback_pool().submit(self._deliver_callback_safely, finished)
+        return finished
+
+    def _get_callback_pool(self) -> ThreadPoolExecutor:
+        with self._cond:
+            if self._callback_pool is None:
+                self._callback_pool = ThreadPoolExecutor(
+                    max_workers=self._callback_workers,
+                    thread_name_prefix="validation-job-callback",
+                )
+            return self._callback_pool
+
+    def _deliver_callback_safely(self, record: JobRecord) -> None:
+        try:
+            self._deliver_callback(record)
+        except Exception:
+            logger.exception("callback delivery for validation job %s failed", record.job_id)
+
+    def _deliver_callback(self, record: JobRecord) -> None:
+        body = job_to_dict(record)
+        for attempt in range(record.callback_attempts, self._callback_attempts):
+            if self._stop_event.is_set():
+                return
+            delivered = self._callback_sender(record.callback_url or "", body)
+            self.store.record_callback_attempt(record.job_id, delivered)
+            if delivered:
+                return
+            if attempt + 1 < self._callback_attempts:
+                self._stop_event.wait(min(2.0 ** attempt, 20.0) * self._callback_backoff)
+
+
+def job_to_dict(record: JobRecord) -> Dict[str, Any]:
+    return {
+        "jobId": record.job_id,
+        "status": record.status,
+        "priority": record.priority,
+        "createdAt": record.created_at,
+        "updatedAt": record.updated_at,
+        "result": record.result,
+        "error": record.error,
+    }
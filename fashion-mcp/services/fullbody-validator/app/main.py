@@ -2,18 +2,31 @@ from __future__ import annotations
 
 import base64
 import os
+import threading
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from io import BytesIO
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from urllib.error import URLError
 from urllib.request import Request, urlopen
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from PIL import Image
 
-from .models import ValidateRequest, ValidateResponse, ValidationChecks, ValidationMetrics
-from .pose import assess_pose
-from .quality import estimate_quality
+from .concurrency import AIMDConcurrencyController
+from .jobs import JobRunner, JobStore, job_to_dict
+from .models import (
+    JobStatusResponse,
+    JobSubmitRequest,
+    ValidateRequest,
+    ValidateResponse,
+    ValidationChecks,
+    ValidationMetrics,
+)
+from .pose import PoseAssessment, assess_pose, backend_parallelism
+from .quality import QualityMetrics, estimate_quality
+from .scheduler import BULK, INTERACTIVE, REQUEST_CLASSES, PriorityScheduler
 
 
 @dataclass
@@ -30,10 +43,104 @@ class Settings:
     min_body_coverage: float = float(os.getenv("FULLBODY_MIN_BODY_COVERAGE", "0.70"))
     min_frontal_score: float = float(os.getenv("FULLBODY_MIN_FRONTAL_SCORE", "0.45"))
     min_landmark_confidence: float = float(os.getenv("FULLBODY_MIN_LANDMARK_CONFIDENCE", "0.55"))
+    # Async job queue. Results live in a local SQLite file and are purged after the TTL.
+    jobs_db_path: str = os.getenv("FULLBODY_JOBS_DB_PATH", "/tmp/fullbody-validator-jobs.sqlite3")
+    jobs_ttl_seconds: float = float(os.getenv("FULLBODY_JOBS_TTL_SECONDS", "86400"))
+    jobs_workers: int = int(os.getenv("FULLBODY_JOBS_WORKERS", "1"))
+    # Inference admission. Requests are classed interactive/bulk (X-Request-Class
+    # header, otherwise by endpoint) and share slots by weight; reserved slots
+    # are added on top of the shared limit and held back for their class.
+    inference_concurrency: int = int(os.getenv("FULLBODY_INFERENCE_CONCURRENCY", "2"))
+    interactive_weight: float = float(os.getenv("FULLBODY_INTERACTIVE_WEIGHT", "9"))
+    bulk_weight: float = float(os.getenv("FULLBODY_BULK_WEIGHT", "1"))
+    interactive_reserved: int = int(os.getenv("FULLBODY_INTERACTIVE_RESERVED", "1"))
+    # When autotuning, FULLBODY_INFERENCE_CONCURRENCY is only the starting limit;
+    # an AIMD controller moves it within [min, max] based on assess_pose model
+    # time. A max of 0 means the usable CPU count, honouring the cgroup quota.
+    concurrency_autotune: bool = os.getenv("FULLBODY_CONCURRENCY_AUTOTUNE", "true").strip().lower() in ("1", "true")
+    concurrency_min: int = int(os.getenv("FULLBODY_CONCURRENCY_MIN", "1"))
+    concurrency_max: int = int(os.getenv("FULLBODY_CONCURRENCY_MAX", "0"))
+    concurrency_latency_tolerance: float = float(os.getenv("FULLBODY_CONCURRENCY_LATENCY_TOLERANCE", "2.0"))
+    concurrency_backoff: float = float(os.getenv("FULLBODY_CONCURRENCY_BACKOFF", "0.75"))
+    concurrency_window: int = int(os.getenv("FULLBODY_CONCURRENCY_WINDOW", "20"))
 
 
 settings = Settings()
-app = FastAPI(title="fullbody-validator", version="0.1.0")
+scheduler = PriorityScheduler(
+    capacity=settings.inference_concurrency,
+    weights={INTERACTIVE: settings.interactive_weight, BULK: settings.bulk_weight},
+    reserved={INTERACTIVE: settings.interactive_reserved},
+)
+
+
+def _build_concurrency_controller(
+    config: Settings,
+    gate: PriorityScheduler,
+) -> Optional[AIMDConcurrencyController]:
+    if not config.concurrency_autotune:
+        return None
+    # The controller tunes the shared limit only; reserved interactive slots sit
+    # on top of it, so backing off to 1 keeps the interactive floor.
+    controller = AIMDConcurrencyController(
+        initial_limit=config.inference_concurrency,
+        min_limit=config.concurrency_min,
+        max_limit=config.concurrency_max or backend_parallelism(),
+        tolerance=config.concurrency_latency_tolerance,
+        backoff=config.concurrency_backoff,
+        window_size=config.concurrency_window,
+        on_change=gate.set_capacity,
+    )
+    gate.set_capacity(controller.limit)
+    return controller
+
+
+concurrency_controller = _build_concurrency_controller(settings, scheduler)
+
+
+_job_runner: Optional[JobRunner] = None
+_job_runner_lock = threading.Lock()
+
+
+def _run_job_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    request_class = payload.get("requestClass", BULK)
+    return _run_validation(ValidateRequest(**payload), request_class).model_dump()
+
+
+def _start_job_runner() -> None:
+    global _job_runner
+    with _job_runner_lock:
+        if _job_runner is None:
+            store = JobStore(settings.jobs_db_path, ttl_seconds=settings.jobs_ttl_seconds)
+            _job_runner = JobRunner(store, _run_job_payload, workers=settings.jobs_workers)
+            # Starting re-queues jobs left outstanding by a previous process and
+            # begins TTL purging, independent of any /jobs traffic.
+            _job_runner.start()
+
+
+def _require_job_runner() -> JobRunner:
+    runner = _job_runner
+    if runner is None:
+        raise HTTPException(status_code=503, detail="job_runner_unavailable")
+    return runner
+
+
+def _stop_job_runner() -> None:
+    global _job_runner
+    with _job_runner_lock:
+        if _job_runner is not None:
+            _job_runner.stop()
+            _job_runner.store.close()
+            _job_runner = None
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    _start_job_runner()
+    yield
+    _stop_job_runner()
+
+
+app = FastAPI(title="fullbody-validator", version="0.1.0", lifespan=_lifespan)
 
 
 def _decode_base64_image(payload: str) -> bytes:
@@ -49,6 +156,15 @@ def _fetch_url_image(url: str) -> bytes:
         return response.read()
 
 
+def _resolve_request_class(header_value: Optional[str], default: str) -> str:
+    if header_value is None or not header_value.strip():
+        return default
+    value = header_value.strip().lower()
+    if value not in REQUEST_CLASSES:
+        raise HTTPException(status_code=400, detail="invalid_request_class")
+    return value
+
+
 def _load_image(request: ValidateRequest) -> Image.Image:
     data: bytes
     if request.imageBase64:
@@ -87,16 +203,48 @@ def healthz() -> dict:
     }
 
 
-@app.post("/validate", response_model=ValidateResponse)
-def validate(request: ValidateRequest) -> ValidateResponse:
+_IMAGE_LOAD_ERRORS = (ValueError, URLError, OSError, base64.binascii.Error)
+
+
+def _infer(image: Image.Image) -> Tuple[QualityMetrics, PoseAssessment]:
+    quality = estimate_quality(image)
+    pose = assess_pose(image)
+    if concurrency_controller is not None:
+        # Model time only: waits on the backend locks grow with the limit by
+        # construction and would make the controller chase its own queueing.
+        concurrency_controller.observe(pose.inference_ms, scheduler.in_flight)
+    return quality, pose
+
+
+def _run_validation(request: ValidateRequest, request_class: str = INTERACTIVE) -> ValidateResponse:
     try:
         image = _load_image(request)
-    except (ValueError, URLError, OSError, base64.binascii.Error):
+    except _IMAGE_LOAD_ERRORS:
         return _fail_response(["no_person_detected"])
 
-    quality = estimate_quality(image)
-    pose = assess_pose(image)
+    with scheduler.slot(request_class):
+        quality, pose = _infer(image)
+    return _build_response(request, quality, pose)
+
+
+async def _run_validation_async(request: ValidateRequest, request_class: str) -> ValidateResponse:
+    try:
+        image = await run_in_threadpool(_load_image, request)
+    except _IMAGE_LOAD_ERRORS:
+        return _fail_response(["no_person_detected"])
+
+    # Wait for admission on the event loop so queued requests do not pin
+    # threadpool threads; only admitted work is handed to a thread.
+    async with scheduler.aslot(request_class):
+        quality, pose = await run_in_threadpool(_infer, image)
+    return _build_response(request, quality, pose)
+
 
+def _build_response(
+    request: ValidateRequest,
+    quality: QualityMetrics,
+    pose: PoseAssessment,
+) -> ValidateResponse:
     require_feet_visible = bool(request.checks.get("requireFeetVisible", True))
     front_facing = pose.frontal_score >= settings.min_frontal_score
 
@@ -168,3 +316,42 @@ def validate(request: ValidateRequest) -> ValidateResponse:
             frontFacing=front_facing,
         ),
     )
+
+
+@app.post("/validate", response_model=ValidateResponse)
+async def validate(
+    request: ValidateRequest,
+    x_request_class: Optional[str] = Header(default=None),
+) -> ValidateResponse:
+    return await _run_validation_async(request, _resolve_request_class(x_request_class, INTERACTIVE))
+
+
+@app.get("/metrics")
+def metrics() -> dict:
+    return {
+        "scheduler": scheduler.snapshot(),
+        "concurrency": concurrency_controller.snapshot() if concurrency_controller is not None else None,
+    }
+
+
+@app.post("/jobs", response_model=JobStatusResponse, status_code=202)
+def submit_job(
+    request: JobSubmitRequest,
+    x_request_class: Optional[str] = Header(default=None),
+) -> JobStatusResponse:
+    payload = request.model_dump(exclude={"priority", "callbackUrl"})
+    payload["requestClass"] = _resolve_request_class(x_request_class, BULK)
+    record = _require_job_runner().submit(
+        payload,
+        priority=request.priority,
+        callback_url=request.callbackUrl,
+    )
+    return JobStatusResponse(**job_to_dict(record))
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job(job_id: str) -> JobStatusResponse:
+    record = _require_job_runner().store.get(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="job_not_found")
+    return JobStatusResponse(**job_to_dict(record))
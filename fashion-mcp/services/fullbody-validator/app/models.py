@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from typing import List, Optional
+from urllib.parse import urlparse
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 FailureReason = str
@@ -36,3 +37,29 @@ class ValidateResponse(BaseModel):
     reasons: List[FailureReason] = Field(default_factory=list)
     metrics: ValidationMetrics
     checks: ValidationChecks
+
+
+class JobSubmitRequest(ValidateRequest):
+    # Lower values drain first; bulk re-validation should use the upper range.
+    priority: int = Field(default=5, ge=0, le=9)
+    callbackUrl: Optional[str] = None
+
+    @field_validator("callbackUrl")
+    @classmethod
+    def _callback_url_is_http(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return value
+        parsed = urlparse(value)
+        if parsed.scheme not in ("http", "https") or not parsed.netloc:
+            raise ValueError("callbackUrl must be an http(s) URL")
+        return value
+
+
+class JobStatusResponse(BaseModel):
+    jobId: str
+    status: str
+    priority: int
+    createdAt: float
+    updatedAt: float
+    result: Optional[ValidateResponse] = None
+    error: Optional[str] = None
@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import os
 import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Callable, Iterator, List, Optional
 
 import numpy as np
 from PIL import Image
 
+from .concurrency import available_cpus
+
 
 @dataclass
 class PoseAssessment:
@@ -18,6 +22,8 @@ class PoseAssessment:
     front_facing: bool
     head_visible: bool
     people_count: int
+    # Time spent running the model itself, excluding waits for a free graph.
+    inference_ms: float = 0.0
 
 
 def _clamp(value: float, lo: float, hi: float) -> float:
@@ -57,61 +63,119 @@ def _assess_pose_heuristic(image: Image.Image) -> PoseAssessment:
     )
 
 
-_mp_ok: bool = False
-_mp_import_error: Optional[str] = None
-_mp_pose = None
-_mp_face = None
-_pose_lock = threading.Lock()
-_face_lock = threading.Lock()
+class _GraphPool:
+    """
+    Pool of MediaPipe graph instances.
 
+    A single graph must not process two images at once, so each call borrows
+    its own instance. The pool grows on demand up to `max_size` (the usable CPU
+    count), letting as many inferences run in parallel as the scheduler admits.
+    """
 
-def _init_mediapipe() -> None:
-    global _mp_ok, _mp_import_error, _mp_pose, _mp_face
-    if _mp_ok or _mp_import_error is not None:
-        return
+    def __init__(self, factory: Callable[[], Any], max_size: int) -> None:
+        self._factory = factory
+        self._max_size = max(1, max_size)
+        self._idle: List[Any] = []
+        self._created = 0
+        self._cond = threading.Condition()
+
+    def prime(self) -> None:
+        graph = self._factory()
+        with self._cond:
+            self._created += 1
+            self._idle.append(graph)
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        graph = None
+        with self._cond:
+            while not self._idle and self._created >= self._max_size:
+                self._cond.wait()
+            if self._idle:
+                graph = self._idle.pop()
+            else:
+                self._created += 1
+        if graph is None:
+            try:
+                graph = self._factory()
+            except BaseException:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+        try:
+            yield graph
+        finally:
+            with self._cond:
+                self._idle.append(graph)
+                self._cond.notify()
 
-    try:
-        import mediapipe as mp  # type: ignore
-
-        # Pose: single-person landmarks.
-        _mp_pose = mp.solutions.pose.Pose(
-            static_image_mode=True,
-            model_complexity=2,
-            enable_segmentation=False,
-            min_detection_confidence=0.5,
-        )
 
-        # Face detection: helps reject group photos.
-        _mp_face = mp.solutions.face_detection.FaceDetection(
-            model_selection=1,
-            min_detection_confidence=0.5,
-        )
+_mp_ok: bool = False
+_mp_import_error: Optional[str] = None
+_pose_pool: Optional[_GraphPool] = None
+_face_pool: Optional[_GraphPool] = None
+_init_lock = threading.Lock()
 
-        _mp_ok = True
-    except Exception as exc:  # pragma: no cover
-        _mp_import_error = str(exc)
-        _mp_ok = False
 
+def _init_mediapipe() -> None:
+    global _mp_ok, _mp_import_error, _pose_pool, _face_pool
+    with _init_lock:
+        if _mp_ok or _mp_import_error is not None:
+            return
 
-def _mediapipe_face_count(rgb: np.ndarray) -> int:
+        try:
+            import mediapipe as mp  # type: ignore
+
+            # Pose: single-person landmarks.
+            def make_pose() -> Any:
+                return mp.solutions.pose.Pose(
+                    static_image_mode=True,
+                    model_complexity=2,
+                    enable_segmentation=False,
+                    min_detection_confidence=0.5,
+                )
+
+            # Face detection: helps reject group photos.
+            def make_face() -> Any:
+                return mp.solutions.face_detection.FaceDetection(
+                    model_selection=1,
+                    min_detection_confidence=0.5,
+                )
+
+            _pose_pool = _GraphPool(make_pose, backend_parallelism())
+            _face_pool = _GraphPool(make_face, backend_parallelism())
+            # Build one of each up front so a broken install fails here, closed.
+            _pose_pool.prime()
+            _face_pool.prime()
+
+            _mp_ok = True
+        except Exception as exc:  # pragma: no cover
+            _mp_import_error = str(exc)
+            _mp_ok = False
+
+
+def _mediapipe_face_count(rgb: np.ndarray) -> tuple[int, float]:
     _init_mediapipe()
-    if not _mp_ok or _mp_face is None:
-        return 0
+    if not _mp_ok or _face_pool is None:
+        return 0, 0.0
 
-    with _face_lock:
-        result = _mp_face.process(rgb)
+    with _face_pool.acquire() as face:
+        started = time.perf_counter()
+        result = face.process(rgb)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
     detections = getattr(result, "detections", None)
     if not detections:
-        return 0
+        return 0, elapsed_ms
     try:
-        return int(len(detections))
+        return int(len(detections)), elapsed_ms
     except Exception:
-        return 0
+        return 0, elapsed_ms
 
 
 def _assess_pose_mediapipe(image: Image.Image) -> PoseAssessment:
     _init_mediapipe()
-    if not _mp_ok or _mp_pose is None:
+    if not _mp_ok or _pose_pool is None:
         # If strict backend requested but unavailable, fail closed.
         return PoseAssessment(
             body_coverage=0.0,
@@ -124,10 +188,12 @@ def _assess_pose_mediapipe(image: Image.Image) -> PoseAssessment:
         )
 
     rgb = np.asarray(image.convert("RGB"))
-    face_count = _mediapipe_face_count(rgb)
+    face_count, face_ms = _mediapipe_face_count(rgb)
 
-    with _pose_lock:
-        result = _mp_pose.process(rgb)
+    with _pose_pool.acquire() as pose:
+        started = time.perf_counter()
+        result = pose.process(rgb)
+        inference_ms = face_ms + (time.perf_counter() - started) * 1000.0
     pose_landmarks = getattr(result, "pose_landmarks", None)
     if not pose_landmarks or not getattr(pose_landmarks, "landmark", None):
         # If we saw a face but no pose, treat as a person present but invalid for full-body.
@@ -140,6 +206,7 @@ def _assess_pose_mediapipe(image: Image.Image) -> PoseAssessment:
             front_facing=False,
             head_visible=False,
             people_count=people_count,
+            inference_ms=inference_ms,
         )
 
     landmarks = list(pose_landmarks.landmark)
@@ -261,12 +328,25 @@ def _assess_pose_mediapipe(image: Image.Image) -> PoseAssessment:
         front_facing=bool(front_facing),
         head_visible=bool(head_visible),
         people_count=int(people_count),
+        inference_ms=inference_ms,
     )
 
 
+def _pose_backend() -> str:
+    return os.getenv("FULLBODY_POSE_BACKEND", "mediapipe").strip().lower()
+
+
+def backend_parallelism() -> int:
+    """How many assess_pose calls can usefully run at once: one per usable CPU."""
+    # Both backends are CPU-bound; MediaPipe runs one pooled graph per call.
+    return available_cpus()
+
+
 def assess_pose(image: Image.Image) -> PoseAssessment:
-    backend = os.getenv("FULLBODY_POSE_BACKEND", "mediapipe").strip().lower()
-    if backend == "heuristic":
-        return _assess_pose_heuristic(image)
+    if _pose_backend() == "heuristic":
+        started = time.perf_counter()
+        assessment = _assess_pose_heuristic(image)
+        assessment.inference_ms = (time.perf_counter() - started) * 1000.0
+        return assessment
     return _assess_pose_mediapipe(image)
 
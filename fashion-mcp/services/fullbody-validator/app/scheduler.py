@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional
+
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+REQUEST_CLASSES = (INTERACTIVE, BULK)
+
+_LATENCY_WINDOW = 512
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round((pct / 100.0) * (len(ordered) - 1)))))
+    return float(ordered[idx])
+
+
+class _Waiter:
+    """A queued admission request; `notify` wakes whoever is waiting on it."""
+
+    __slots__ = ("notify", "enqueued", "admitted", "granted")
+
+    def __init__(self, notify: Callable[[], None]) -> None:
+        self.notify = notify
+        self.enqueued = time.perf_counter()
+        self.admitted = 0.0
+        self.granted = False
+
+
+def _resolve_future(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+@dataclass
+class _ClassState:
+    weight: float
+    reserved: int
+    waiters: Deque[_Waiter] = field(default_factory=deque)
+    in_flight: int = 0
+    admitted: int = 0
+    completed: int = 0
+    # Stride-scheduling pass value; the backlogged class with the lowest pass goes next.
+    pass_value: float = 0.0
+    wait_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=_LATENCY_WINDOW))
+    service_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=_LATENCY_WINDOW))
+
+
+class PriorityScheduler:
+    """
+    Admission gate for the inference stage.
+
+    Waiting requests are admitted by weighted fair sharing across request
+    classes. `capacity` is the shared limit (the one the concurrency controller
+    tunes); `reserved` slots of a class sit on top of it and can only be taken
+    by that class, so interactive traffic always finds a free slot even when
+    bulk work is queued and the shared limit has been backed off to 1.
+
+    Admission is dispatched: whenever a slot frees up, the next waiter is
+    granted and woken. `slot()` blocks the calling thread; `aslot()` waits on
+    the event loop, so queued async requests do not hold threadpool threads.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        weights: Dict[str, float],
+        reserved: Optional[Dict[str, int]] = None,
+    ) -> None:
+        reserved = reserved or {}
+        self._lock = threading.Lock()
+        self._capacity = max(1, int(capacity))
+        self._classes: Dict[str, _ClassState] = {
+            name: _ClassState(
+                weight=max(float(weights.get(name, 1.0)), 1e-6),
+                reserved=max(0, int(reserved.get(name, 0))),
+            )
+            for name in REQUEST_CLASSES
+        }
+        self._virtual_time = 0.0
+
+    @property
+    def capacity(self) -> int:
+        with self._lock:
+            return self._capacity
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(state.in_flight for state in self._classes.values())
+
+    def set_capacity(self, capacity: int) -> None:
+        with self._lock:
+            self._capacity = max(1, int(capacity))
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, request_class: str) -> Iterator[None]:
+        state = self._classes[request_class]
+        granted = threading.Event()
+        waiter = _Waiter(granted.set)
+        with self._lock:
+            self._enqueue(state, waiter)
+        try:
+            granted.wait()
+        except BaseException:
+            self._abandon(state, waiter)
+            raise
+        try:
+            yield
+        finally:
+            self._release(state, waiter)
+
+    @asynccontextmanager
+    async def aslot(self, request_class: str) -> AsyncIterator[None]:
+        state = self._classes[request_class]
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[None]" = loop.create_future()
+        waiter = _Waiter(lambda: loop.call_soon_threadsafe(_resolve_future, future))
+        with self._lock:
+            self._enqueue(state, waiter)
+        try:
+            await future
+        except BaseException:
+            self._abandon(state, waiter)
+            raise
+        try:
+            yield
+        finally:
+            self._release(state, waiter)
+
+    def _enqueue(self, state: _ClassState, waiter: _Waiter) -> None:
+        if not state.waiters:
+            # A class that was idle does not get to bank credit from the idle period.
+            state.pass_value = max(state.pass_value, self._virtual_time)
+        state.waiters.append(waiter)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while True:
+            name = self._next_class()
+            if name is None:
+                return
+            state = self._classes[name]
+            waiter = state.waiters.popleft()
+            state.in_flight += 1
+            state.admitted += 1
+            self._virtual_time = state.pass_value
+            state.pass_value += 1.0 / state.weight
+            waiter.granted = True
+            waiter.admitted = time.perf_counter()
+            state.wait_ms.append((waiter.admitted - waiter.enqueued) * 1000.0)
+            waiter.notify()
+
+    def _abandon(self, state: _ClassState, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter.granted:
+                # Granted just as the waiter gave up; hand the slot on.
+                state.in_flight -= 1
+                self._dispatch()
+            else:
+                state.waiters.remove(waiter)
+
+    def _release(self, state: _ClassState, waiter: _Waiter) -> None:
+        finished = time.perf_counter()
+        with self._lock:
+            state.in_flight -= 1
+            state.completed += 1
+            state.service_ms.append((finished - waiter.admitted) * 1000.0)
+            self._dispatch()
+
+    def _total_capacity(self) -> int:
+        return self._capacity + sum(state.reserved for state in self._classes.values())
+
+    def _limit_for(self, name: str, total: int) -> int:
+        held_for_others = sum(
+            max(0, self._classes[other].reserved - self._classes[other].in_flight)
+            for other in REQUEST_CLASSES
+            if other != name
+        )
+        return total - held_for_others
+
+    def _next_class(self) -> Optional[str]:
+        total = self._total_capacity()
+        total_in_flight = sum(s.in_flight for s in self._classes.values())
+        if total_in_flight >= total:
+            return None
+        best: Optional[str] = None
+        for name in REQUEST_CLASSES:
+            state = self._classes[name]
+            if not state.waiters:
+                continue
+            if total_in_flight >= self._limit_for(name, total):
+                continue
+            if best is None or state.pass_value < self._classes[best].pass_value:
+                best = name
+        return best
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            classes = {}
+            for name, state in self._classes.items():
+                wait = list(state.wait_ms)
+                service = list(state.service_ms)
+                classes[name] = {
+                    "weight": state.weight,
+                    "reserved": state.reserved,
+                    "queueDepth": len(state.waiters),
+                    "inFlight": state.in_flight,
+                    "admitted": state.admitted,
+                    "completed": state.completed,
+                    "waitMsP50": _percentile(wait, 50),
+                    "waitMsP99": _percentile(wait, 99),
+                    "serviceMsP50": _percentile(service, 50),
+                    "serviceMsP99": _percentile(service, 99),
+                }
+            return {
+                "capacity": self._capacity,
+                "totalCapacity": self._total_capacity(),
+                "classes": classes,
+            }
@@ -0,0 +1,156 @@
+from fastapi.testclient import TestClient
+
+from app import main
+from app.concurrency import DECREASE, HOLD, INCREASE, AIMDConcurrencyController, available_cpus
+from app.main import Settings, _build_concurrency_controller, app
+from app.scheduler import BULK, INTERACTIVE, PriorityScheduler
+
+
+def _feed(controller: AIMDConcurrencyController, latency_ms: float, in_flight: int, count: int) -> None:
+    for _ in range(count):
+        controller.observe(latency_ms, in_flight)
+
+
+def test_controller_grows_when_saturated_and_latency_is_flat() -> None:
+    changes = []
+    controller = AIMDConcurrencyController(
+        initial_limit=2,
+        min_limit=1,
+        max_limit=4,
+        window_size=5,
+        on_change=changes.append,
+    )
+
+    _feed(controller, 100.0, in_flight=2, count=5)
+    _feed(controller, 110.0, in_flight=3, count=5)
+    _feed(controller, 105.0, in_flight=4, count=5)
+    _feed(controller, 100.0, in_flight=4, count=5)
+
+    assert controller.limit == 4
+    assert changes == [3, 4]
+    assert controller.snapshot()["decisions"] == {INCREASE: 2, DECREASE: 0, HOLD: 2}
+
+
+def test_controller_holds_when_limit_is_not_used() -> None:
+    controller = AIMDConcurrencyController(initial_limit=3, min_limit=1, max_limit=8, window_size=5)
+    _feed(controller, 100.0, in_flight=1, count=15)
+
+    assert controller.limit == 3
+    assert controller.snapshot()["decisions"][HOLD] == 3
+
+
+def test_controller_backs_off_multiplicatively_on_latency_spike() -> None:
+    changes = []
+    controller = AIMDConcurrencyController(
+        initial_limit=8,
+        min_limit=2,
+        max_limit=16,
+        tolerance=2.0,
+        backoff=0.5,
+        window_size=4,
+        on_change=changes.append,
+    )
+
+    _feed(controller, 50.0, in_flight=1, count=4)
+    _feed(controller, 400.0, in_flight=8, count=4)
+    _feed(controller, 400.0, in_flight=4, count=4)
+
+    assert changes == [4, 2]
+    snapshot = controller.snapshot()
+    assert snapshot["limit"] == 2
+    assert snapshot["baselineMs"] == 50.0
+    assert snapshot["recentDecisions"][-1]["decision"] == DECREASE
+
+
+def test_slow_window_at_the_floor_is_recorded_as_hold() -> None:
+    changes = []
+    controller = AIMDConcurrencyController(
+        initial_limit=2,
+        min_limit=1,
+        max_limit=4,
+        backoff=0.5,
+        window_size=2,
+        on_change=changes.append,
+    )
+
+    _feed(controller, 10.0, in_flight=1, count=2)
+    _feed(controller, 500.0, in_flight=2, count=2)
+    _feed(controller, 500.0, in_flight=1, count=2)
+    _feed(controller, 500.0, in_flight=1, count=2)
+
+    snapshot = controller.snapshot()
+    assert changes == [1]
+    assert snapshot["limit"] == 1
+    assert snapshot["decisions"] == {INCREASE: 0, DECREASE: 1, HOLD: 3}
+    assert [d["decision"] for d in snapshot["recentDecisions"]][-2:] == [HOLD, HOLD]
+
+
+def test_metrics_expose_concurrency_controller() -> None:
+    client = TestClient(app)
+    data = client.get("/metrics").json()
+
+    concurrency = data["concurrency"]
+    assert concurrency is not None
+    assert concurrency["minLimit"] <= concurrency["limit"] <= concurrency["maxLimit"]
+    assert data["scheduler"]["capacity"] == concurrency["limit"]
+
+
+def test_backoff_to_one_keeps_the_interactive_reservation() -> None:
+    config = Settings()
+    config.concurrency_autotune = True
+    config.inference_concurrency = 4
+    config.concurrency_min = 1
+    config.concurrency_max = 8
+    config.concurrency_backoff = 0.5
+    config.concurrency_window = 2
+    scheduler = PriorityScheduler(
+        capacity=4,
+        weights={INTERACTIVE: 9, BULK: 1},
+        reserved={INTERACTIVE: 1},
+    )
+    controller = _build_concurrency_controller(config, scheduler)
+
+    _feed(controller, 10.0, in_flight=1, count=2)
+    _feed(controller, 500.0, in_flight=4, count=2)
+    _feed(controller, 500.0, in_flight=2, count=2)
+    _feed(controller, 500.0, in_flight=1, count=2)
+
+    assert controller.limit == 1
+    assert scheduler.capacity == 1
+    assert scheduler.snapshot()["totalCapacity"] == 2
+
+    # Bulk fills the shared slot; interactive still gets its reserved one.
+    with scheduler.slot(BULK):
+        with scheduler.slot(INTERACTIVE):
+            assert scheduler.in_flight == 2
+
+
+def test_default_limits_span_one_to_backend_parallelism(monkeypatch) -> None:
+    monkeypatch.setattr(main, "backend_parallelism", lambda: 6)
+    config = Settings()
+    config.concurrency_autotune = True
+    config.concurrency_min = 1
+    config.concurrency_max = 0
+    scheduler = PriorityScheduler(capacity=2, weights={}, reserved={INTERACTIVE: 1})
+
+    controller = _build_concurrency_controller(config, scheduler)
+    assert controller.min_limit == 1
+    assert controller.max_limit == 6
+
+
+def test_available_cpus_honours_cgroup_v2_quota(tmp_path) -> None:
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    assert available_cpus(str(tmp_path)) == min(2, available_cpus(str(tmp_path / "none")))
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert available_cpus(str(tmp_path)) == available_cpus(str(tmp_path / "none"))
+
+
+def test_available_cpus_honours_cgroup_v1_quota(tmp_path) -> None:
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("50000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert available_cpus(str(tmp_path)) == 1
+
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    assert available_cpus(str(tmp_path)) == available_cpus(str(tmp_path / "none"))
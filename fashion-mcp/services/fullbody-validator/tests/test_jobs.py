@@ -0,0 +1,272 @@
+import base64
+import sqlite3
+import threading
+import time
+from io import BytesIO
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app import main
+from app.jobs import JOB_FAILED, JOB_QUEUED, JOB_SUCCEEDED, JobRunner, JobStore, post_callback
+
+
+def _portrait_base64(width: int = 900, height: int = 1600) -> str:
+    image = Image.new("RGB", (width, height), color=(180, 160, 140))
+    buf = BytesIO()
+    image.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def test_job_store_purges_only_expired_finished_jobs(tmp_path) -> None:
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl_seconds=60)
+    done = store.create({"imageUrl": "a"}, priority=5)
+    pending = store.create({"imageUrl": "b"}, priority=5)
+    store.mark_finished(done.job_id, JOB_SUCCEEDED, result={"approved": True})
+
+    assert store.purge_expired(now=time.time() + 30) == 0
+    assert store.purge_expired(now=time.time() + 120) == 1
+    assert store.get(done.job_id) is None
+    assert store.get(pending.job_id).status == JOB_QUEUED
+    store.close()
+
+
+def test_job_store_adds_callback_columns_to_existing_files(tmp_path) -> None:
+    path = str(tmp_path / "jobs.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE validation_jobs (job_id TEXT PRIMARY KEY, status TEXT NOT NULL,"
+        " priority INTEGER NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL,"
+        " callback_url TEXT, payload TEXT, result TEXT, error TEXT)"
+    )
+    conn.execute(
+        "INSERT INTO validation_jobs VALUES ('old', 'queued', 5, 1.0, 1.0, NULL, '{}', NULL, NULL)"
+    )
+    conn.commit()
+    conn.close()
+
+    store = JobStore(path, ttl_seconds=60)
+    old = store.get("old")
+    assert old.callback_attempts == 0
+    assert old.callback_delivered_at is None
+    store.close()
+
+
+def test_job_runner_drains_in_priority_order_and_survives_restart(tmp_path) -> None:
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path, ttl_seconds=60)
+    store.create({"name": "bulk"}, priority=9)
+    store.create({"name": "interactive"}, priority=0)
+    store.create({"name": "bulk-2"}, priority=9)
+    store.close()
+
+    seen = []
+    drained = threading.Event()
+
+    def handler(payload):
+        seen.append(payload["name"])
+        if len(seen) == 3:
+            drained.set()
+        return {"ok": True}
+
+    runner = JobRunner(JobStore(path, ttl_seconds=60), handler)
+    runner.start()
+    assert drained.wait(5)
+    runner.stop()
+
+    assert seen == ["interactive", "bulk", "bulk-2"]
+    runner.store.close()
+
+
+def test_worker_survives_store_errors_outside_the_handler(tmp_path) -> None:
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl_seconds=60)
+    broken = store.create({"name": "broken"}, priority=0)
+    healthy = store.create({"name": "healthy"}, priority=5)
+    original_mark_running = store.mark_running
+
+    def mark_running(job_id):
+        if job_id == broken.job_id:
+            raise sqlite3.OperationalError("database is locked")
+        original_mark_running(job_id)
+
+    store.mark_running = mark_running
+    done = threading.Event()
+
+    def handler(payload):
+        done.set()
+        return {"ok": True}
+
+    runner = JobRunner(store, handler)
+    runner.start()
+    assert done.wait(5)
+    runner.stop()
+
+    assert store.get(healthy.job_id).status == JOB_SUCCEEDED
+    assert store.get(broken.job_id).status == JOB_QUEUED
+    store.close()
+
+
+def test_job_runner_records_failures_and_sends_callback(tmp_path) -> None:
+    delivered = []
+    sent = threading.Event()
+
+    def handler(payload):
+        raise RuntimeError("boom")
+
+    def sender(url, body):
+        delivered.append((url, body))
+        sent.set()
+        return True
+
+    runner = JobRunner(JobStore(":memory:", ttl_seconds=60), handler, callback_sender=sender)
+    record = runner.store.create({}, priority=5, callback_url="http://callback.test/hook")
+    finished = runner.run_job(record.job_id)
+
+    assert sent.wait(5)
+    assert finished.status == JOB_FAILED
+    assert finished.error == "boom"
+    assert finished.payload is None
+    assert delivered == [
+        ("http://callback.test/hook", {
+            "jobId": record.job_id,
+            "status": JOB_FAILED,
+            "priority": 5,
+            "createdAt": finished.created_at,
+            "updatedAt": finished.updated_at,
+            "result": None,
+            "error": "boom",
+        })
+    ]
+
+    runner.stop()
+
+
+def test_failing_callback_does_not_block_the_drain_loop() -> None:
+    attempts = []
+    gave_up = threading.Event()
+
+    def sender(url, body):
+        attempts.append(time.perf_counter())
+        if len(attempts) == 3:
+            gave_up.set()
+        return False
+
+    runner = JobRunner(
+        JobStore(":memory:", ttl_seconds=60),
+        lambda payload: {"ok": True},
+        callback_sender=sender,
+        callback_attempts=3,
+        callback_backoff_seconds=0.5,
+    )
+    first = runner.store.create({}, priority=5, callback_url="http://dead.test/hook")
+    second = runner.store.create({}, priority=5)
+
+    started = time.perf_counter()
+    runner.run_job(first.job_id)
+    runner.run_job(second.job_id)
+    assert time.perf_counter() - started < 0.5
+    assert runner.store.get(second.job_id).status == JOB_SUCCEEDED
+
+    assert gave_up.wait(5)
+    time.sleep(0.2)
+    # No sleep follows the final attempt, and no further attempts are made.
+    assert len(attempts) == 3
+    runner.stop()
+
+
+def test_undelivered_callbacks_resume_after_restart(tmp_path) -> None:
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path, ttl_seconds=60)
+    record = store.create({}, priority=5, callback_url="http://callback.test/hook")
+    # The previous process finished the job but stopped before the webhook went out.
+    store.mark_finished(record.job_id, JOB_SUCCEEDED, result={"approved": True})
+    store.record_callback_attempt(record.job_id, delivered=False)
+    store.close()
+
+    delivered = threading.Event()
+
+    def sender(url, body):
+        delivered.set()
+        return body["jobId"] == record.job_id
+
+    runner = JobRunner(JobStore(path, ttl_seconds=60), lambda payload: {}, callback_sender=sender)
+    runner.start()
+    assert delivered.wait(5)
+    deadline = time.time() + 5
+    while time.time() < deadline and runner.store.get(record.job_id).callback_delivered_at is None:
+        time.sleep(0.01)
+    runner.stop()
+
+    stored = runner.store.get(record.job_id)
+    assert stored.callback_attempts == 2
+    assert stored.callback_delivered_at is not None
+    assert runner.store.pending_callbacks(max_attempts=3) == []
+    runner.store.close()
+
+
+def test_jobs_api_submit_and_poll(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("FULLBODY_POSE_BACKEND", "heuristic")
+    monkeypatch.setattr(main.settings, "jobs_db_path", str(tmp_path / "jobs.sqlite3"))
+    main._stop_job_runner()
+
+    with TestClient(main.app) as client:
+        response = client.post(
+            "/jobs",
+            json={"imageBase64": _portrait_base64(), "mimeType": "image/png", "priority": 1},
+        )
+        assert response.status_code == 202
+        job_id = response.json()["jobId"]
+
+        deadline = time.time() + 5
+        data = {}
+        while time.time() < deadline:
+            data = client.get(f"/jobs/{job_id}").json()
+            if data["status"] == JOB_SUCCEEDED:
+                break
+            time.sleep(0.02)
+
+        assert data["status"] == JOB_SUCCEEDED, data
+        assert data["priority"] == 1
+        assert data["result"]["metrics"]["width"] == 900
+        assert data["result"]["metrics"]["height"] == 1600
+
+        assert client.get("/jobs/does-not-exist").status_code == 404
+
+
+def test_jobs_api_rejects_non_http_callback_urls(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(main.settings, "jobs_db_path", str(tmp_path / "jobs.sqlite3"))
+    main._stop_job_runner()
+
+    with TestClient(main.app) as client:
+        for url in ("file:///etc/hostname", "ftp://example.com/hook", "not a url"):
+            response = client.post("/jobs", json={"imageUrl": "https://example.com/a.jpg", "callbackUrl": url})
+            assert response.status_code == 422, url
+
+    assert post_callback("file:///etc/hostname", {}) is False
+
+
+def test_app_startup_resumes_outstanding_jobs_without_jobs_traffic(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("FULLBODY_POSE_BACKEND", "heuristic")
+    path = str(tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(main.settings, "jobs_db_path", path)
+    main._stop_job_runner()
+
+    seed = JobStore(path, ttl_seconds=60)
+    record = seed.create(
+        {"imageBase64": _portrait_base64(), "mimeType": "image/png", "requestClass": "bulk"},
+        priority=5,
+    )
+    seed.close()
+
+    with TestClient(main.app) as client:
+        assert client.get("/healthz").status_code == 200
+
+        deadline = time.time() + 5
+        status = JOB_QUEUED
+        while time.time() < deadline:
+            status = main._job_runner.store.get(record.job_id).status
+            if status == JOB_SUCCEEDED:
+                break
+            time.sleep(0.02)
+
+        assert status == JOB_SUCCEEDED
@@ -1,6 +1,9 @@
+import threading
+
 from PIL import Image
 
-from app.pose import assess_pose
+from app.concurrency import available_cpus
+from app.pose import _GraphPool, assess_pose, backend_parallelism
 
 
 def test_pose_assessment_prefers_tall_portrait_for_feet_visibility(monkeypatch) -> None:
@@ -21,3 +24,32 @@ def test_pose_assessment_rejects_wide_frame_as_non_fullbody(monkeypatch) -> None
     assert assessment.feet_visible is False
     assert assessment.front_facing is False
     assert assessment.landmark_confidence < 0.7
+
+
+def test_backend_parallelism_follows_usable_cpus(monkeypatch) -> None:
+    monkeypatch.setenv("FULLBODY_POSE_BACKEND", "heuristic")
+    assert backend_parallelism() == available_cpus()
+    assessment = assess_pose(Image.new("RGB", (900, 1600), color=(200, 200, 200)))
+    assert assessment.inference_ms >= 0.0
+
+
+def test_graph_pool_reuses_instances_and_caps_parallelism() -> None:
+    created = []
+    pool = _GraphPool(lambda: created.append(object()) or created[-1], max_size=2)
+
+    with pool.acquire() as first:
+        with pool.acquire() as second:
+            assert first is not second
+            blocked = threading.Event()
+
+            def third() -> None:
+                with pool.acquire():
+                    blocked.set()
+
+            thread = threading.Thread(target=third)
+            thread.start()
+            assert not blocked.wait(0.1)
+    thread.join(5)
+
+    assert blocked.is_set()
+    assert len(created) == 2
@@ -0,0 +1,185 @@
+import asyncio
+import base64
+import threading
+import time
+from io import BytesIO
+
+import httpx
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app import main
+from app.main import app
+from app.pose import assess_pose
+from app.scheduler import BULK, INTERACTIVE, PriorityScheduler
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return
+        time.sleep(0.005)
+    raise AssertionError("condition not reached")
+
+
+def _queue_depth(scheduler: PriorityScheduler, name: str) -> int:
+    return scheduler.snapshot()["classes"][name]["queueDepth"]
+
+
+def test_reserved_slot_keeps_interactive_unblocked_by_bulk() -> None:
+    scheduler = PriorityScheduler(
+        capacity=1,
+        weights={INTERACTIVE: 1, BULK: 1},
+        reserved={INTERACTIVE: 1},
+    )
+    release = threading.Event()
+    second_bulk_admitted = threading.Event()
+
+    def hold_bulk() -> None:
+        with scheduler.slot(BULK):
+            release.wait(5)
+
+    def second_bulk() -> None:
+        with scheduler.slot(BULK):
+            second_bulk_admitted.set()
+
+    holder = threading.Thread(target=hold_bulk)
+    holder.start()
+    _wait_for(lambda: scheduler.snapshot()["classes"][BULK]["inFlight"] == 1)
+
+    waiter = threading.Thread(target=second_bulk)
+    waiter.start()
+    _wait_for(lambda: _queue_depth(scheduler, BULK) == 1)
+
+    # The shared slot is taken by bulk, but the reserved one is still free.
+    with scheduler.slot(INTERACTIVE):
+        assert not second_bulk_admitted.is_set()
+
+    release.set()
+    holder.join(5)
+    waiter.join(5)
+    assert second_bulk_admitted.is_set()
+
+
+def test_reservation_sits_on_top_of_the_shared_limit() -> None:
+    scheduler = PriorityScheduler(capacity=1, weights={}, reserved={INTERACTIVE: 1})
+    snapshot = scheduler.snapshot()
+    assert snapshot["capacity"] == 1
+    assert snapshot["totalCapacity"] == 2
+    assert snapshot["classes"][INTERACTIVE]["reserved"] == 1
+
+    scheduler.set_capacity(3)
+    assert scheduler.snapshot()["totalCapacity"] == 4
+
+
+def test_weighted_fair_sharing_admits_bulk_without_starving_it() -> None:
+    scheduler = PriorityScheduler(capacity=1, weights={INTERACTIVE: 3, BULK: 1})
+    order = []
+    release = threading.Event()
+
+    def hold() -> None:
+        with scheduler.slot(BULK):
+            release.wait(5)
+
+    def worker(name: str) -> None:
+        with scheduler.slot(name):
+            order.append(name)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    _wait_for(lambda: scheduler.snapshot()["classes"][BULK]["inFlight"] == 1)
+
+    threads = []
+    for name, count in ((INTERACTIVE, 6), (BULK, 2)):
+        for _ in range(count):
+            thread = threading.Thread(target=worker, args=(name,))
+            thread.start()
+            threads.append(thread)
+    _wait_for(lambda: _queue_depth(scheduler, INTERACTIVE) == 6 and _queue_depth(scheduler, BULK) == 2)
+
+    release.set()
+    holder.join(5)
+    for thread in threads:
+        thread.join(5)
+
+    i, b = INTERACTIVE, BULK
+    assert order == [i, i, i, i, b, i, i, b]
+
+    stats = scheduler.snapshot()["classes"]
+    assert stats[INTERACTIVE]["completed"] == 6
+    assert stats[BULK]["completed"] == 3
+    assert stats[BULK]["waitMsP99"] >= stats[BULK]["waitMsP50"]
+
+
+def test_validate_rejects_unknown_request_class_and_reports_metrics(monkeypatch) -> None:
+    monkeypatch.setenv("FULLBODY_POSE_BACKEND", "heuristic")
+    client = TestClient(app)
+
+    response = client.post("/validate", json={}, headers={"X-Request-Class": "urgent"})
+    assert response.status_code == 400
+
+    data = client.get("/metrics").json()
+    assert set(data["scheduler"]["classes"]) == {INTERACTIVE, BULK}
+    assert data["scheduler"]["capacity"] >= 1
+
+
+def _png_base64(width: int, height: int) -> str:
+    buf = BytesIO()
+    Image.new("RGB", (width, height), color=(180, 160, 140)).save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def test_interactive_validate_is_not_stuck_behind_more_bulk_than_threadpool_threads(monkeypatch) -> None:
+    # anyio's default threadpool has 40 threads; queue more bulk requests than that.
+    bulk_requests = 60
+    monkeypatch.setenv("FULLBODY_POSE_BACKEND", "heuristic")
+    gate = PriorityScheduler(capacity=1, weights={INTERACTIVE: 9, BULK: 1}, reserved={INTERACTIVE: 1})
+    monkeypatch.setattr(main, "scheduler", gate)
+    monkeypatch.setattr(main, "concurrency_controller", None)
+
+    release = threading.Event()
+
+    def slow_bulk_pose(image):
+        # Bulk images are small; hold them in inference until the test is done.
+        if image.size[0] == 64:
+            release.wait(10)
+        return assess_pose(image)
+
+    monkeypatch.setattr(main, "assess_pose", slow_bulk_pose)
+
+    async def scenario() -> float:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://validator") as client:
+            bulk_body = {"imageBase64": _png_base64(64, 64)}
+            bulk = [
+                asyncio.create_task(
+                    client.post("/validate", json=bulk_body, headers={"X-Request-Class": "bulk"})
+                )
+                for _ in range(bulk_requests)
+            ]
+            deadline = time.time() + 10
+            while _queue_depth(gate, BULK) < bulk_requests - 1 and time.time() < deadline:
+                await asyncio.sleep(0.01)
+            assert _queue_depth(gate, BULK) == bulk_requests - 1
+
+            started = time.perf_counter()
+            response = await asyncio.wait_for(
+                client.post("/validate", json={"imageBase64": _png_base64(900, 1600)}),
+                timeout=5,
+            )
+            elapsed = time.perf_counter() - started
+            assert response.status_code == 200
+
+            release.set()
+            results = await asyncio.gather(*bulk)
+            assert all(r.status_code == 200 for r in results)
+            return elapsed
+
+    try:
+        elapsed = asyncio.run(scenario())
+    finally:
+        release.set()
+
+    assert elapsed < 2.0
+    assert gate.snapshot()["classes"][BULK]["completed"] == bulk_requests